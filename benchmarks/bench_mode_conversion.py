@@ -0,0 +1,98 @@
+"""Compare the old ``im.convert("RGB")`` path with ``prepare_mode`` for JPEG output.
+
+Both variants convert the same RGBA PNG files to JPEG end to end. Each runs in
+a fresh process so peak RSS is not shared between them.
+
+    python benchmarks/bench_mode_conversion.py --count 20 --size 2000x1500
+"""
+
+import argparse
+import multiprocessing
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from PIL import Image
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from main import build_save_kwargs, convert_single  # noqa: E402
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def make_sources(folder: Path, count: int, size: tuple[int, int]) -> list[Path]:
+    sources = []
+    for i in range(count):
+        im = Image.new("RGBA", size, (i % 256, 80, 160, 0))
+        im.paste((200, 40, 40, 128), (0, 0, size[0] // 2, size[1] // 2))
+        path = folder / f"src{i}.png"
+        im.save(path)
+        sources.append(path)
+    return sources
+
+
+def peak_rss_mb() -> float:
+    if resource is None:
+        return float("nan")
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes.
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def convert_old(input_path: Path, output_path: Path) -> None:
+    with Image.open(input_path) as im:
+        im = im.convert("RGB")
+        im.save(output_path, format="JPEG", **build_save_kwargs("JPEG", "high"))
+
+
+def convert_new(input_path: Path, output_path: Path) -> None:
+    convert_single(str(input_path), str(output_path), "JPEG", "high")
+
+
+def run_variant(variant: str, sources: list[Path], queue) -> None:
+    convert = convert_old if variant == "convert" else convert_new
+    baseline_rss = peak_rss_mb()
+    started = time.perf_counter()
+    for path in sources:
+        convert(path, path.with_suffix(f".{variant}.jpg"))
+    elapsed = time.perf_counter() - started
+    queue.put(
+        {
+            "variant": variant,
+            "seconds": elapsed,
+            "per_image_ms": elapsed / len(sources) * 1000,
+            "peak_rss_growth_mb": peak_rss_mb() - baseline_rss,
+        }
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=20)
+    parser.add_argument("--size", default="2000x1500")
+    args = parser.parse_args()
+    size = tuple(int(v) for v in args.size.lower().split("x"))
+
+    ctx = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as tmp:
+        sources = make_sources(Path(tmp), args.count, size)
+        for variant in ("convert", "prepare_mode"):
+            queue = ctx.Queue()
+            proc = ctx.Process(target=run_variant, args=(variant, sources, queue))
+            proc.start()
+            result = queue.get()
+            proc.join()
+            print(
+                f"{result['variant']:>13}: {result['seconds']:.3f}s "
+                f"({result['per_image_ms']:.2f} ms/image), "
+                f"peak RSS +{result['peak_rss_growth_mb']:.1f} MiB"
+            )
+
+
+if __name__ == "__main__":
+    main()
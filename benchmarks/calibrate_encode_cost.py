@@ -0,0 +1,91 @@
+"""Measure the DECODE_COST / ENCODE_COST / PRESET_ENCODE_COST scheduler tables.
+
+Times decoding of each source format and encoding to each target format and
+quality preset, in milliseconds per megapixel of an RGB image with photo-like
+noise, and prints the tables ready to paste into main.py.
+
+    python benchmarks/calibrate_encode_cost.py --size 1024 --repeat 3
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from PIL import Image
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from main import FORMATS, QUALITY_PRESETS, build_save_kwargs  # noqa: E402
+
+
+def sample_image(size: int) -> Image.Image:
+    gradient = Image.linear_gradient("L").resize((size, size))
+    noise = Image.effect_noise((size, size), 12).convert("L")
+    return Image.merge("RGB", (gradient, noise, gradient.rotate(90)))
+
+
+def best_of(repeat: int, func) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def encode(im: Image.Image, path: Path, fmt: str, preset: str) -> None:
+    # Saved to a real file as in a batch; JPEG "optimize" cannot stream into BytesIO.
+    im.save(path, format=fmt, **build_save_kwargs(fmt, preset))
+
+
+def decode(path: Path) -> None:
+    with Image.open(path) as im:
+        im.load()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=1024)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    im = sample_image(args.size)
+    megapixels = args.size * args.size / 1_000_000
+
+    # Presets only change the save options of these formats; the rest get one value.
+    preset_formats = [
+        fmt for fmt in FORMATS if any(fmt in overrides for overrides in QUALITY_PRESETS.values())
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        decode_cost = {}
+        encode_cost = {}
+        preset_encode_cost = {}
+        for fmt in FORMATS:
+            path = Path(tmp) / f"sample.{fmt.lower()}"
+            if fmt in preset_formats:
+                preset_encode_cost[fmt] = {
+                    preset: best_of(args.repeat, lambda: encode(im, path, fmt, preset))
+                    * 1000
+                    / megapixels
+                    for preset in QUALITY_PRESETS
+                }
+            else:
+                encode_cost[fmt] = (
+                    best_of(args.repeat, lambda: encode(im, path, fmt, "high")) * 1000 / megapixels
+                )
+            encode(im, path, fmt, "high")
+            decode_cost[fmt] = best_of(args.repeat, lambda: decode(path)) * 1000 / megapixels
+
+    print("DECODE_COST = {" + ", ".join(f'"{fmt}": {cost:.0f}' for fmt, cost in decode_cost.items()) + "}")
+    print("ENCODE_COST = {" + ", ".join(f'"{fmt}": {cost:.0f}' for fmt, cost in encode_cost.items()) + "}")
+    print("PRESET_ENCODE_COST = {")
+    for fmt, costs in preset_encode_cost.items():
+        row = ", ".join(f'"{preset}": {cost:.0f}' for preset, cost in costs.items())
+        print(f'    "{fmt}": {{{row}}},')
+    print("}")
+
+if __name__ == "__main__":
+    main()
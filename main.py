@@ -1,12 +1,19 @@
+import argparse
+import hashlib
 import json
 import math
+import multiprocessing
+import os
+import socket
 import sys
 import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pathlib import Path
+from typing import Callable
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 
-from PIL import Image, ImageTk
+from PIL import Image, ImageColor, ImageTk
 
 try:
     from tkinterdnd2 import DND_FILES, TkinterDnD
@@ -16,13 +23,27 @@ except Exception:  # Optional dependency
 
 
 FORMATS = ["PNG", "WEBP", "JPEG", "BMP", "TIFF", "GIF"]
+CLI_COMMANDS = {"shard", "merge"}
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".webp", ".bmp", ".tif", ".tiff", ".gif"}
 QUALITY_PRESETS = {
     "lossless": {"WEBP": {"lossless": True, "quality": 100, "method": 6}},
     "high": {"WEBP": {"lossless": False, "quality": 90, "method": 6}, "JPEG": {"quality": 90}},
     "balanced": {"WEBP": {"lossless": False, "quality": 80, "method": 4}, "JPEG": {"quality": 80}},
     "compact": {"WEBP": {"lossless": False, "quality": 70, "method": 4}, "JPEG": {"quality": 70}},
 }
-CHUNK_SIZE = 1024 * 256
+DEFAULT_BACKGROUND = "#ffffff"
+DEFAULT_BACKGROUND_RGB = ImageColor.getrgb(DEFAULT_BACKGROUND)[:3]
+# Formats without alpha and the modes they can store as-is.
+OPAQUE_MODES = {"JPEG": {"L", "RGB", "CMYK"}, "BMP": {"1", "L", "P", "RGB"}}
+# Milliseconds per megapixel of RGB, measured with benchmarks/calibrate_encode_cost.py
+# (1024x1024 photo-like sample, Pillow 12, x86-64). Only the ratios matter.
+DECODE_COST = {"PNG": 26, "WEBP": 40, "JPEG": 13, "BMP": 3, "TIFF": 24, "GIF": 9}
+ENCODE_COST = {"PNG": 1131, "BMP": 3, "TIFF": 71, "GIF": 845}
+# Formats whose save options depend on the quality preset.
+PRESET_ENCODE_COST = {
+    "WEBP": {"lossless": 22580, "high": 668, "balanced": 164, "compact": 163},
+    "JPEG": {"lossless": 46, "high": 33, "balanced": 22, "compact": 17},
+}
 BASE_DIR = Path(sys.executable).parent if getattr(sys, "frozen", False) else Path(__file__).resolve().parent
 CONFIG_PATH = BASE_DIR / "settings.json"
 STRINGS_PATH = BASE_DIR / "strings.json"
@@ -44,25 +65,418 @@ def suggest_output_path(input_path: str, fmt: str) -> str:
     return str(path.with_suffix(f".{fmt.lower()}"))
 
 
+def parse_background(value: str) -> tuple[int, int, int]:
+    """Colour from the GUI setting; anything unreadable falls back to the default."""
+    try:
+        return ImageColor.getrgb(value)[:3]
+    except (ValueError, AttributeError):
+        return DEFAULT_BACKGROUND_RGB
+
+
+def background_arg(value: str) -> tuple[int, int, int]:
+    try:
+        return ImageColor.getrgb(value)[:3]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"not a colour: {value!r}") from None
+
+
+def flatten_palette(im: Image.Image, background: tuple[int, int, int]) -> Image.Image:
+    """Blend transparent palette entries with ``background``; pixels stay 1 byte each."""
+    transparency = im.info.get("transparency")
+    palette = im.getpalette("RGBA") or []
+    if transparency is None and all(a == 255 for a in palette[3::4]):
+        return im
+    entries = len(palette) // 4
+    alphas = list(palette[3::4])
+    if isinstance(transparency, int):
+        if transparency < entries:
+            alphas[transparency] = 0
+    elif isinstance(transparency, bytes):
+        for i, a in enumerate(transparency[:entries]):
+            alphas[i] = min(alphas[i], a)
+    flat = []
+    for i in range(entries):
+        a = alphas[i]
+        for c, bg in zip(palette[i * 4:i * 4 + 3], background):
+            flat.append((c * a + bg * (255 - a) + 127) // 255)
+    out = im.copy()
+    out.putpalette(flat, "RGB")
+    out.info.pop("transparency", None)
+    return out
+
+
+def output_mode(mode: str, fmt: str) -> str:
+    """Mode an image in ``mode`` is stored in when saved as ``fmt``."""
+    allowed = OPAQUE_MODES.get(fmt)
+    if allowed is None or mode in allowed:
+        return mode
+    if mode != "P" and Image.getmodebands(mode) == 1 and "L" in allowed:
+        return "L"
+    return "RGB"
+
+
+def prepare_mode(im: Image.Image, fmt: str, background: tuple[int, int, int]) -> Image.Image:
+    """Bring ``im`` into a mode ``fmt`` can store, compositing alpha onto ``background``.
+
+    Returns ``im`` itself when no conversion is needed, otherwise a new image.
+    """
+    target = output_mode(im.mode, fmt)
+    if im.mode == "P" and fmt in OPAQUE_MODES:
+        flat = flatten_palette(im, background)
+        return flat if target == "P" else flat.convert(target)
+    if target == im.mode:
+        return im
+    if im.mode == "PA":
+        im = im.convert("RGBA")
+    if im.mode in {"RGBA", "LA"}:
+        # RGBA/LA paste onto RGB without an intermediate copy, using their own alpha as mask.
+        canvas = Image.new("RGB", im.size, background)
+        canvas.paste(im, (0, 0), im)
+        return canvas
+    if im.mode.startswith("I;16"):
+        # A plain convert clips 16-bit samples at 255; scale them down instead.
+        return im.convert("I").point(lambda v: v / 256).convert(target)
+    return im.convert(target)
+
+
 def convert_image(input_path: str, output_path: str, fmt: str) -> None:
+    convert_single(input_path, output_path, fmt, "lossless")
+
+
+def build_output_path(input_path: str, fmt: str, out_dir: str) -> str:
+    base = Path(input_path).stem
+    suffix = f".{fmt.lower()}"
+    if out_dir:
+        return str(Path(out_dir) / f"{base}{suffix}")
+    return str(Path(input_path).with_suffix(suffix))
+
+
+def build_save_kwargs(fmt: str, preset: str) -> dict:
+    save_kwargs = {}
+    if fmt == "WEBP":
+        save_kwargs.update(lossless=True, method=6, quality=100)
+    elif fmt == "JPEG":
+        save_kwargs.update(quality=95, subsampling=0, optimize=True)
+    elif fmt == "PNG":
+        save_kwargs.update(optimize=True)
+    elif fmt == "TIFF":
+        save_kwargs.update(compression="tiff_lzw")
+    elif fmt == "GIF":
+        save_kwargs.update(save_all=False)
+
+    preset_map = QUALITY_PRESETS.get(preset, {})
+    override = preset_map.get(fmt)
+    if override:
+        save_kwargs.update(override)
+        if fmt == "JPEG":
+            save_kwargs.setdefault("subsampling", 0)
+            save_kwargs.setdefault("optimize", True)
+    return save_kwargs
+
+
+def convert_single(
+    input_path: str,
+    output_path: str,
+    fmt: str,
+    preset: str,
+    background: tuple[int, int, int] = DEFAULT_BACKGROUND_RGB,
+) -> None:
     with Image.open(input_path) as im:
-        save_kwargs = {}
+        flat = prepare_mode(im, fmt, background)
+        if flat is not im:
+            # Free the decoded source so only the converted raster is alive while encoding.
+            im.close()
+        save_kwargs = build_save_kwargs(fmt, preset)
+        flat.save(output_path, format=fmt, **save_kwargs)
+
+
+def probe_image(path: str) -> dict:
+    """Read only the header: format, size and mode. Frames are not counted, since
+    that walks the whole file and only the first frame is converted anyway."""
+    info = {"path": path, "format": None, "width": 0, "height": 0, "mode": None, "bytes": 1}
+    try:
+        info["bytes"] = max(1, Path(path).stat().st_size)
+        with Image.open(path) as im:
+            info.update(format=im.format, width=im.size[0], height=im.size[1], mode=im.mode)
+    except Exception:
+        pass
+    return info
+
+
+def probe_images(paths: list[str], stop: Callable[[], bool] | None = None) -> list[dict]:
+    """Probe headers in parallel; once ``stop()`` is true the rest are left unprobed."""
+
+    def probe(path: str) -> dict:
+        if stop and stop():
+            return {"path": path, "format": None, "width": 0, "height": 0, "mode": None, "bytes": 1}
+        return probe_image(path)
+
+    with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as pool:
+        return list(pool.map(probe, paths))
+
+
+def estimate_cost(info: dict, fmt: str, preset: str) -> float:
+    """Expected conversion time in milliseconds, from the probed header."""
+    if not info["width"]:
+        # Unreadable header: the conversion will fail right away.
+        return 0.0
+    megapixels = info["width"] * info["height"] / 1_000_000
+    # The tables are measured on RGB: decoding scales with the source's bands,
+    # encoding with the bands of the mode actually saved.
+    source_bands = Image.getmodebands(info["mode"])
+    target_bands = Image.getmodebands(output_mode(info["mode"], fmt))
+    decode = DECODE_COST.get(info["format"], max(DECODE_COST.values()))
+    if fmt in PRESET_ENCODE_COST:
+        encode = PRESET_ENCODE_COST[fmt][preset]
+    else:
+        encode = ENCODE_COST[fmt]
+    return megapixels / 3 * (decode * source_bands + encode * target_bands)
+
+
+def estimate_costs(
+    files: list[str], fmt: str, preset: str, stop: Callable[[], bool] | None = None
+) -> list[float]:
+    return [estimate_cost(info, fmt, preset) for info in probe_images(files, stop)]
 
-        if fmt == "WEBP":
-            save_kwargs.update(lossless=True, method=6, quality=100)
-        elif fmt == "JPEG":
-            save_kwargs.update(quality=95, subsampling=0, optimize=True)
-        elif fmt == "PNG":
-            save_kwargs.update(optimize=True)
-        elif fmt == "TIFF":
-            save_kwargs.update(compression="tiff_lzw")
-        elif fmt == "GIF":
-            save_kwargs.update(save_all=False)
 
-        if fmt in {"JPEG", "BMP"} and im.mode in {"RGBA", "LA", "P"}:
-            im = im.convert("RGB")
+def schedule(files: list[str], fmt: str, preset: str) -> list[tuple[str, float]]:
+    """Order jobs largest-first by estimated cost, which keeps a worker pool from
+    idling while one late, huge file finishes."""
+    jobs = list(zip(files, estimate_costs(files, fmt, preset)))
+    return sorted(jobs, key=lambda job: (-job[1], job[0]))
 
-        im.save(output_path, format=fmt, **save_kwargs)
+
+def format_eta(seconds: float) -> str:
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+    return f"{seconds // 60}:{seconds % 60:02d}"
+
+
+def collect_inputs(paths: list[str]) -> list[tuple[str, str]]:
+    """Expand files and folders into sorted ``(path, key)`` pairs.
+
+    ``key`` is the path relative to the folder it was found in (just the name
+    for files given directly), so it does not depend on where the data is mounted.
+    """
+    found: dict[str, tuple[str, str]] = {}
+    for p in paths:
+        path = Path(p.strip().strip('"'))
+        if path.is_dir():
+            for child in path.rglob("*"):
+                if child.is_file() and child.suffix.lower() in IMAGE_EXTENSIONS:
+                    found.setdefault(
+                        str(child.resolve()), (str(child), child.relative_to(path).as_posix())
+                    )
+        elif path.is_file():
+            found.setdefault(str(path.resolve()), (str(path), path.name))
+    return sorted(found.values(), key=lambda item: (item[1], item[0]))
+
+
+def build_shard_output_path(input_path: str, key: str, fmt: str, out_dir: str) -> str:
+    """Like ``build_output_path``, but keeps the folder layout under ``out_dir``."""
+    suffix = f".{fmt.lower()}"
+    if out_dir:
+        return str(Path(out_dir) / Path(key).with_suffix(suffix))
+    return str(Path(input_path).with_suffix(suffix))
+
+
+def find_output_conflicts(inputs: list[tuple[str, str]], fmt: str, out_dir: str) -> dict[str, str]:
+    """Map every input whose output path is shared with another input to that path."""
+    claims: dict[str, list[str]] = {}
+    for input_path, key in inputs:
+        output_path = build_shard_output_path(input_path, key, fmt, out_dir)
+        claims.setdefault(os.path.normcase(os.path.abspath(output_path)), []).append(input_path)
+    conflicts = {}
+    for output_path, claimed_by in claims.items():
+        if len(claimed_by) > 1:
+            for input_path in claimed_by:
+                conflicts[input_path] = output_path
+    return conflicts
+
+
+def shard_of(key: str, shard_count: int) -> int:
+    """Stable shard number for an input key, identical on every machine and run."""
+    digest = hashlib.sha1(key.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % shard_count
+
+
+def select_shard(
+    inputs: list[tuple[str, str]], shard_index: int, shard_count: int
+) -> list[tuple[str, str]]:
+    if shard_count < 1:
+        raise ValueError("shard count must be at least 1")
+    if not 0 <= shard_index < shard_count:
+        raise ValueError(f"shard index must be in 0..{shard_count - 1}")
+    return [item for item in inputs if shard_of(item[1], shard_count) == shard_index]
+
+
+def run_shard(
+    inputs: list[tuple[str, str]],
+    fmt: str,
+    preset: str,
+    out_dir: str,
+    shard_index: int,
+    shard_count: int,
+    summary_path: str,
+    workers: int = 1,
+    background: tuple[int, int, int] = DEFAULT_BACKGROUND_RGB,
+) -> dict:
+    """Convert this shard's part of ``inputs`` and write a JSON summary.
+
+    Inputs that would write the same output file are reported as errors and
+    skipped; every shard sees the full input list, so they all agree on which.
+    """
+    started = time.time()
+    converted: list[dict] = []
+    errors: list[dict] = []
+    conflicts = find_output_conflicts(inputs, fmt, out_dir)
+    keys = dict(select_shard(inputs, shard_index, shard_count))
+    with ProcessPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {}
+        for input_path, _cost in schedule(list(keys), fmt, preset):
+            key = keys[input_path]
+            if input_path in conflicts:
+                errors.append(
+                    {
+                        "input": input_path,
+                        "key": key,
+                        "error": f"output {conflicts[input_path]} is shared with another input",
+                    }
+                )
+                continue
+            output_path = build_shard_output_path(input_path, key, fmt, out_dir)
+            Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+            future = pool.submit(
+                convert_single, input_path, output_path, fmt, preset, background
+            )
+            futures[future] = (input_path, key, output_path)
+        for future in as_completed(futures):
+            input_path, key, output_path = futures[future]
+            try:
+                future.result()
+            except Exception as exc:
+                errors.append({"input": input_path, "key": key, "error": str(exc)})
+            else:
+                converted.append({"input": input_path, "key": key, "output": output_path})
+    converted.sort(key=lambda item: item["input"])
+    errors.sort(key=lambda item: item["input"])
+    summary = {
+        "shard_index": shard_index,
+        "shard_count": shard_count,
+        "format": fmt,
+        "preset": preset,
+        "host": socket.gethostname(),
+        "started": started,
+        "finished": time.time(),
+        "converted": converted,
+        "errors": errors,
+    }
+    Path(summary_path).write_text(
+        json.dumps(summary, ensure_ascii=False, indent=2),
+        encoding="utf-8",
+    )
+    return summary
+
+
+def merge_summaries(summary_paths: list[str]) -> dict:
+    """Combine per-shard summaries; reports shards that have not reported yet and
+    outputs written by more than one shard (nodes given different inputs)."""
+    shard_count = None
+    seen: set[int] = set()
+    converted: list[dict] = []
+    errors: list[dict] = []
+    for p in summary_paths:
+        data = json.loads(Path(p).read_text(encoding="utf-8"))
+        if shard_count is None:
+            shard_count = data["shard_count"]
+        elif data["shard_count"] != shard_count:
+            raise ValueError(f"{p}: shard count {data['shard_count']} != {shard_count}")
+        if data["shard_index"] in seen:
+            raise ValueError(f"{p}: duplicate shard {data['shard_index']}")
+        seen.add(data["shard_index"])
+        converted.extend(data["converted"])
+        errors.extend(data["errors"])
+    shard_count = shard_count or 0
+    writers: dict[str, int] = {}
+    for item in converted:
+        writers[item["output"]] = writers.get(item["output"], 0) + 1
+    return {
+        "shard_count": shard_count,
+        "shards": sorted(seen),
+        "missing_shards": [i for i in range(shard_count) if i not in seen],
+        "duplicate_outputs": sorted(out for out, count in writers.items() if count > 1),
+        "converted": sorted(converted, key=lambda item: item["key"]),
+        "errors": sorted(errors, key=lambda item: item["key"]),
+    }
+
+
+def run_cli(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog="main.py",
+        description="Headless batch conversion split across independent processes.",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    shard = commands.add_parser("shard", help="convert one shard of the inputs")
+    shard.add_argument("inputs", nargs="+", help="image files or folders")
+    shard.add_argument("--shard-index", type=int, required=True)
+    shard.add_argument("--shard-count", type=int, required=True)
+    shard.add_argument("--format", choices=FORMATS, default=FORMATS[0])
+    shard.add_argument("--quality", choices=list(QUALITY_PRESETS), default="lossless")
+    shard.add_argument("--output-dir", default="")
+    shard.add_argument("--jobs", type=int, default=os.cpu_count() or 1)
+    shard.add_argument(
+        "--background",
+        type=background_arg,
+        default=DEFAULT_BACKGROUND,
+        help="colour that transparent pixels are flattened onto for JPEG/BMP",
+    )
+    shard.add_argument("--summary", help="default: shard-<index>-of-<count>.json")
+
+    merge = commands.add_parser("merge", help="merge shard summaries")
+    merge.add_argument("summaries", nargs="+")
+    merge.add_argument("--output", default="summary.json")
+
+    args = parser.parse_args(argv)
+    try:
+        if args.command == "shard":
+            summary_path = args.summary or f"shard-{args.shard_index}-of-{args.shard_count}.json"
+            summary = run_shard(
+                collect_inputs(args.inputs),
+                args.format,
+                args.quality,
+                args.output_dir,
+                args.shard_index,
+                args.shard_count,
+                summary_path,
+                args.jobs,
+                args.background,
+            )
+            print(
+                f"shard {args.shard_index}/{args.shard_count}: "
+                f"{len(summary['converted'])} converted, {len(summary['errors'])} errors"
+            )
+            return 1 if summary["errors"] else 0
+        merged = merge_summaries(args.summaries)
+        Path(args.output).write_text(
+            json.dumps(merged, ensure_ascii=False, indent=2),
+            encoding="utf-8",
+        )
+        print(
+            f"{len(merged['shards'])}/{merged['shard_count']} shards: "
+            f"{len(merged['converted'])} converted, {len(merged['errors'])} errors"
+        )
+        if merged["missing_shards"]:
+            print(f"missing shards: {merged['missing_shards']}", file=sys.stderr)
+            return 1
+        if merged["duplicate_outputs"]:
+            print(f"written by several shards: {merged['duplicate_outputs']}", file=sys.stderr)
+            return 1
+        return 1 if merged["errors"] else 0
+    except (OSError, ValueError, KeyError) as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 2
 
 
 def main() -> None:
@@ -172,6 +586,7 @@ def main() -> None:
             "format": FORMATS[0],
             "quality": "lossless",
             "output_dir": "",
+            "background": DEFAULT_BACKGROUND,
         }
         try:
             data = json.loads(CONFIG_PATH.read_text(encoding="utf-8"))
@@ -181,6 +596,7 @@ def main() -> None:
             fmt = data.get("format", defaults["format"])
             quality = data.get("quality", defaults["quality"])
             out_dir = data.get("output_dir", defaults["output_dir"])
+            background = data.get("background", defaults["background"])
             if lang not in {"ru", "en"}:
                 lang = defaults["lang"]
             if fmt not in FORMATS:
@@ -189,11 +605,14 @@ def main() -> None:
                 quality = defaults["quality"]
             if not isinstance(out_dir, str):
                 out_dir = defaults["output_dir"]
+            if not isinstance(background, str):
+                background = defaults["background"]
             return {
                 "lang": lang,
                 "format": fmt,
                 "quality": quality,
                 "output_dir": out_dir,
+                "background": background,
             }
         except Exception:
             return defaults
@@ -204,6 +623,7 @@ def main() -> None:
             "format": format_var.get(),
             "quality": quality_key["value"],
             "output_dir": out_dir_var.get().strip(),
+            "background": background_var.get().strip(),
         }
         try:
             CONFIG_PATH.write_text(
@@ -226,6 +646,7 @@ def main() -> None:
     format_var = tk.StringVar(value=settings["format"])
     quality_var = tk.StringVar(value="")
     out_dir_var = tk.StringVar(value=settings["output_dir"])
+    background_var = tk.StringVar(value=settings["background"])
     name_mode_var = tk.StringVar(value="auto")
     file_count_var = tk.StringVar(value="")
     lang_var = tk.StringVar(value=settings["lang"])
@@ -234,6 +655,7 @@ def main() -> None:
     quality_key = {"value": settings["quality"]}
     file_count_state = {"value": 0}
     cancel_flag = {"stop": False}
+    batch_state = {"running": False}
 
     bg_canvas = tk.Canvas(root, bg=COLORS["bg"], highlightthickness=0)
     bg_canvas.place(relx=0, rely=0, relwidth=1, relheight=1)
@@ -305,6 +727,8 @@ def main() -> None:
             update_file_count(files_list.size())
 
     def on_drop(event) -> None:
+        if batch_state["running"]:
+            return
         raw = event.data
         files = root.tk.splitlist(raw)
         add_files(list(files))
@@ -346,96 +770,98 @@ def main() -> None:
             save_settings()
 
     def get_output_path(input_path: str, fmt: str) -> str:
-        base = Path(input_path).stem
-        suffix = f".{fmt.lower()}"
-        out_dir = out_dir_var.get().strip()
-        if out_dir:
-            return str(Path(out_dir) / f"{base}{suffix}")
-        return str(Path(input_path).with_suffix(suffix))
-
-    def get_file_size(path: str) -> int:
-        try:
-            size = Path(path).stat().st_size
-            return size if size > 0 else 1
-        except Exception:
-            return 1
+        return build_output_path(input_path, fmt, out_dir_var.get().strip())
+
+    def advance_progress(
+        done: int, total: int, done_cost: float, total_cost: float, elapsed: float
+    ) -> None:
+        progress_bar.configure(value=done_cost)
+        percent = min(100, int((done_cost / total_cost) * 100))
+        if done_cost > 0 and elapsed > 0:
+            eta = elapsed * (total_cost - done_cost) / done_cost
+            set_status(
+                "processing_eta", done=done, total=total, percent=percent, eta=format_eta(eta)
+            )
+        else:
+            set_status("done_count", done=done, total=total)
+        root.update_idletasks()
 
-    def read_with_progress(path: str, total_read: int, total_bytes: int) -> int:
-        try:
-            with open(path, "rb") as handle:
-                while True:
-                    if cancel_flag["stop"]:
-                        break
-                    chunk = handle.read(CHUNK_SIZE)
-                    if not chunk:
-                        break
-                    total_read += len(chunk)
-                    progress_bar.configure(value=total_read)
-                    percent = min(100, int((total_read / total_bytes) * 100))
-                    set_status("processing", percent=percent)
-                    root.update_idletasks()
-        except Exception:
-            return total_read
-        return total_read
-
-    def build_save_kwargs(fmt: str, preset: str) -> dict:
-        save_kwargs = {}
-        if fmt == "WEBP":
-            save_kwargs.update(lossless=True, method=6, quality=100)
-        elif fmt == "JPEG":
-            save_kwargs.update(quality=95, subsampling=0, optimize=True)
-        elif fmt == "PNG":
-            save_kwargs.update(optimize=True)
-        elif fmt == "TIFF":
-            save_kwargs.update(compression="tiff_lzw")
-        elif fmt == "GIF":
-            save_kwargs.update(save_all=False)
-
-        preset_map = QUALITY_PRESETS.get(preset, {})
-        override = preset_map.get(fmt)
-        if override:
-            save_kwargs.update(override)
-            if fmt == "JPEG":
-                save_kwargs.setdefault("subsampling", 0)
-                save_kwargs.setdefault("optimize", True)
-        return save_kwargs
-
-    def convert_single(input_path: str, output_path: str, fmt: str, preset: str) -> None:
-        with Image.open(input_path) as im:
-            if fmt in {"JPEG", "BMP"} and im.mode in {"RGBA", "LA", "P"}:
-                im = im.convert("RGB")
-            save_kwargs = build_save_kwargs(fmt, preset)
-            im.save(output_path, format=fmt, **save_kwargs)
+    def set_batch_running(running: bool) -> None:
+        batch_state["running"] = running
+        state = "disabled" if running else "normal"
+        radiobuttons = [w for w in name_row.winfo_children() if isinstance(w, ttk.Radiobutton)]
+        for widget in (
+            convert_button,
+            browse_button,
+            clear_button,
+            remove_button,
+            out_button,
+            background_entry,
+            *radiobuttons,
+        ):
+            widget.configure(state=state)
+        for combo in (format_combo, quality_combo, lang_combo):
+            combo.configure(state="disabled" if running else "readonly")
+        cancel_button.configure(state="normal" if running else "disabled")
 
     def do_convert() -> None:
+        if batch_state["running"]:
+            return
         if files_list.size() == 0:
             messagebox.showwarning(tr("no_file_title"), tr("no_files"))
             return
 
-        fmt = format_var.get()
-        preset = get_quality_key()
         save_settings()
         cancel_flag["stop"] = False
+        batch = {
+            "files": list(files_list.get(0, tk.END)),
+            "fmt": format_var.get(),
+            "preset": get_quality_key(),
+            "background": parse_background(background_var.get().strip()),
+        }
+        set_batch_running(True)
+        set_status("estimating")
+        progress_bar.configure(value=0)
+
+        # Header probing can take a while on long lists; it runs on a helper
+        # thread and the Tk loop polls for the result.
+        waiter = ThreadPoolExecutor(max_workers=1)
+        future = waiter.submit(
+            estimate_costs,
+            batch["files"],
+            batch["fmt"],
+            batch["preset"],
+            lambda: cancel_flag["stop"],
+        )
+        waiter.shutdown(wait=False)
+        root.after(50, wait_for_estimates, future, batch)
+
+    def wait_for_estimates(future, batch: dict) -> None:
+        if not future.done():
+            root.after(50, wait_for_estimates, future, batch)
+            return
+        run_batch(future, batch)
+
+    def run_batch(future, batch: dict) -> None:
+        files = batch["files"]
+        fmt = batch["fmt"]
+        preset = batch["preset"]
+        background = batch["background"]
         errors: list[tuple[str, str]] = []
-        files = list(files_list.get(0, tk.END))
-        total_bytes = sum(get_file_size(p) for p in files)
-        total_read = 0
-
-        convert_button.configure(state="disabled")
-        browse_button.configure(state="disabled")
-        clear_button.configure(state="disabled")
-        remove_button.configure(state="disabled")
-        cancel_button.configure(state="normal")
-        set_status("processing", percent=0)
-        progress_bar.configure(maximum=total_bytes, value=0)
-        root.update_idletasks()
 
         try:
-            for i, input_path in enumerate(files):
+            # The GUI converts one file at a time, so list order is kept; the
+            # estimates only drive the progress bar and ETA.
+            costs = future.result()
+            total_cost = sum(costs) or 1
+            done_cost = 0.0
+            elapsed = 0.0
+            progress_bar.configure(maximum=total_cost, value=0)
+            set_status("processing", percent=0)
+            for i, (input_path, cost) in enumerate(zip(files, costs)):
                 if cancel_flag["stop"]:
                     set_status("canceled")
                     break
-                file_size = get_file_size(input_path)
                 output_path = get_output_path(input_path, fmt)
                 if name_mode_var.get() == "ask":
                     output_path = filedialog.asksaveasfilename(
@@ -445,36 +871,27 @@ def main() -> None:
                         filetypes=[(fmt, f"*.{fmt.lower()}"), ("Все файлы", "*.*")],
                     )
                     if not output_path:
-                        total_read += file_size
-                        progress_bar.configure(value=total_read)
+                        total_cost = max(1, total_cost - cost)
+                        progress_bar.configure(maximum=total_cost, value=done_cost)
                         set_status("skipping", done=i + 1, total=len(files))
                         root.update_idletasks()
                         continue
-                total_read = read_with_progress(input_path, total_read, total_bytes)
-                if cancel_flag["stop"]:
-                    set_status("canceled")
-                    break
+                # Only conversion time counts towards the ETA, not time spent in dialogs.
+                started = time.perf_counter()
                 try:
-                    convert_single(input_path, output_path, fmt, preset)
+                    convert_single(input_path, output_path, fmt, preset, background)
                 except Exception as exc:
                     errors.append((input_path, str(exc)))
-                set_status("done_count", done=i + 1, total=len(files))
-                root.update_idletasks()
+                elapsed += time.perf_counter() - started
+                done_cost += cost
+                advance_progress(i + 1, len(files), done_cost, total_cost, elapsed)
         except Exception as exc:
             set_status("error")
             messagebox.showerror(tr("error_title"), tr("convert_failed", error=exc))
-            convert_button.configure(state="normal")
-            browse_button.configure(state="normal")
-            clear_button.configure(state="normal")
-            remove_button.configure(state="normal")
-            cancel_button.configure(state="disabled")
+            set_batch_running(False)
             return
 
-        convert_button.configure(state="normal")
-        browse_button.configure(state="normal")
-        clear_button.configure(state="normal")
-        remove_button.configure(state="normal")
-        cancel_button.configure(state="disabled")
+        set_batch_running(False)
         if cancel_flag["stop"]:
             messagebox.showinfo(tr("cancel_title"), tr("cancel_msg"))
         else:
@@ -619,6 +1036,13 @@ def main() -> None:
         value="ask",
         style="Card.TRadiobutton",
     ).pack(side="left", padx=(8, 0))
+    background_entry = ttk.Entry(
+        name_row, textvariable=background_var, style="Path.TEntry", width=9
+    )
+    background_entry.pack(side="right")
+    background_entry.bind("<FocusOut>", lambda event: save_settings())
+    background_label = ttk.Label(name_row, text="", style="Card.TLabel")
+    background_label.pack(side="right", padx=(0, 8))
 
     note = ttk.Label(
         card,
@@ -661,6 +1085,7 @@ def main() -> None:
         out_label.configure(text=tr("output_dir"))
         out_button.configure(text=tr("choose"))
         name_label.configure(text=tr("names"))
+        background_label.configure(text=tr("background"))
         convert_button.configure(text=tr("convert"))
         cancel_button.configure(text=tr("cancel"))
         lang_label.configure(text=tr("lang"))
@@ -714,10 +1139,20 @@ def main() -> None:
             drop_register(DND_FILES)
             dnd_bind("<<Drop>>", on_drop)
 
+    def on_close() -> None:
+        # Stops a header probe still running on the helper thread.
+        cancel_flag["stop"] = True
+        root.destroy()
+
+    root.protocol("WM_DELETE_WINDOW", on_close)
     animate_background()
 
     root.mainloop()
 
 
 if __name__ == "__main__":
+    # Frozen builds re-launch the exe for pool workers; this handles those launches.
+    multiprocessing.freeze_support()
+    if len(sys.argv) > 1 and sys.argv[1] in CLI_COMMANDS:
+        sys.exit(run_cli(sys.argv[1:]))
     main()
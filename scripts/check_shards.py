@@ -0,0 +1,88 @@
+"""Run several shard processes against a temp folder and check the result.
+
+Every shard gets the input folder spelled differently (relative, ``./``,
+absolute), as separate nodes would. The check fails unless each input is
+converted exactly once or reported as an output conflict.
+
+    python scripts/check_shards.py --shards 3 --files 40
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from PIL import Image
+
+MAIN = Path(__file__).resolve().parent.parent / "main.py"
+
+
+def make_inputs(root: Path, count: int) -> set[str]:
+    """Nested folders reusing the same names, plus one ``x.png``/``x.jpg`` clash."""
+    for i in range(count):
+        folder = root / ("a", "b", "a/deep")[i % 3]
+        folder.mkdir(parents=True, exist_ok=True)
+        Image.new("RGB", (16 + i, 16), (i % 256, 40, 90)).save(folder / f"img{i // 3}.png")
+    Image.new("RGB", (8, 8)).save(root / "x.png")
+    Image.new("RGB", (8, 8)).save(root / "x.jpg")
+    return {"x.png", "x.jpg"}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--shards", type=int, default=3)
+    parser.add_argument("--files", type=int, default=40)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        work = Path(tmp)
+        expected_conflicts = make_inputs(work / "in", args.files)
+        keys = {p.relative_to(work / "in").as_posix() for p in (work / "in").rglob("*") if p.is_file()}
+        spellings = ["in", f".{os.sep}in", str(work / "in")]
+        procs = [
+            subprocess.Popen(
+                [
+                    sys.executable, str(MAIN), "shard", spellings[i % len(spellings)],
+                    "--shard-index", str(i), "--shard-count", str(args.shards),
+                    "--format", "JPEG", "--jobs", "2",
+                    "--output-dir", "out", "--summary", f"shard-{i}.json",
+                ],
+                cwd=work,
+            )
+            for i in range(args.shards)
+        ]
+        for proc in procs:
+            proc.wait()
+        subprocess.run(
+            [sys.executable, str(MAIN), "merge", *[f"shard-{i}.json" for i in range(args.shards)]],
+            cwd=work,
+        )
+        merged = json.loads((work / "summary.json").read_text(encoding="utf-8"))
+
+        converted = [item["key"] for item in merged["converted"]]
+        failed = {item["key"] for item in merged["errors"]}
+        outputs = {p.relative_to(work / "out").as_posix() for p in (work / "out").rglob("*") if p.is_file()}
+        problems = []
+        if merged["missing_shards"] or merged["duplicate_outputs"]:
+            problems.append(f"missing {merged['missing_shards']}, duplicates {merged['duplicate_outputs']}")
+        if len(converted) != len(set(converted)):
+            problems.append("some inputs were converted more than once")
+        if set(converted) | failed != keys or set(converted) & failed:
+            problems.append("inputs not accounted for exactly once")
+        if failed != expected_conflicts:
+            problems.append(f"unexpected errors: {sorted(failed)}")
+        if len(outputs) != len(converted):
+            problems.append(f"{len(outputs)} output files for {len(converted)} conversions")
+
+    for problem in problems:
+        print(f"FAIL: {problem}")
+    if not problems:
+        print(f"OK: {len(converted)} converted once each, {len(failed)} conflicts reported")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())